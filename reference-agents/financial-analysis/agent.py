@@ -11,9 +11,12 @@ Architecture:
 - Writer Worker: Synthesizes analysis into final report
 
 Performance: Handles 100+ concurrent analyses with <5s latency
+
+Requires: numpy (local sentiment engine in sentiment.py)
 """
 
 import os
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, Literal
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
@@ -22,8 +25,11 @@ from langgraph.checkpoint.postgres import PostgresSaver
 from langgraph.types import Command
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+import numpy as np
 import psycopg
 
+from sentiment import aggregate_sentiment, score_articles, sentiment_label, top_topics, TOPIC_NAMES
+
 # Configuration
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -72,18 +78,84 @@ def calculate_technical_indicators(ticker: str) -> dict:
     }
 
 # Tools for Sentiment Worker
-def analyze_news_sentiment(ticker: str) -> dict:
+def fetch_news(ticker: str) -> list[dict]:
     """
-    Analyze news sentiment for given ticker.
-    In production, integrate with news API + sentiment analysis model.
+    Fetch recent news articles for given ticker.
+    In production, integrate with a news API (NewsAPI, Benzinga, etc.)
     """
-    # Mock implementation
-    return {
-        "sentiment_score": 0.75,  # -1 to 1 scale
-        "sentiment_label": "positive",
-        "news_count": 15,
-        "key_topics": ["earnings", "product launch", "market expansion"],
-    }
+    # Mock implementation - sector-wide stories are shared across tickers
+    now = datetime.now(timezone.utc)
+    stories = [
+        (f"{ticker} beats quarterly earnings estimates", "Revenue grew on strong demand and guidance was raised.", 2),
+        (f"{ticker} unveils new product line", "The launch was described as innovative by analysts.", 5),
+        (f"{ticker} announces international expansion", "Expansion into new markets supports growth momentum.", 8),
+        (f"Analysts upgrade {ticker}", "Two analysts upgraded the stock citing robust margins.", 12),
+        (f"{ticker} expands buyback program", "The board approved a larger repurchase and raised the dividend.", 20),
+        (f"{ticker} faces regulator probe", "Regulators opened an investigation; the company expects no fine.", 30),
+        ("Tech stocks rally on rate outlook", "Markets rallied as investors priced in slower hikes.", 3),
+        ("Supply chain slowdown weighs on sector", "Suppliers reported weak orders and lowered forecasts.", 26),
+    ]
+    return [
+        {
+            "title": title,
+            "body": body,
+            "published_at": now - timedelta(hours=age_hours),
+        }
+        for title, body, age_hours in stories
+    ]
+
+
+SENTIMENT_INTERPRETATIONS = {
+    "positive": "Positive sentiment suggests bullish market perception.",
+    "negative": "Negative sentiment indicates bearish market perception.",
+    "neutral": "Neutral sentiment suggests market uncertainty.",
+}
+
+
+def analyze_news_sentiment_batch(tickers: list[str]) -> dict[str, dict]:
+    """
+    Analyze news sentiment for several tickers in one scoring pass.
+    The sentiment worker handles one ticker per run; use this directly to
+    score (and warm the article cache for) a watchlist in one call.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    articles_per_ticker = [fetch_news(ticker) for ticker in tickers]
+    articles = [article for batch in articles_per_ticker for article in batch]
+    ticker_ids = np.repeat(
+        np.arange(len(tickers)), [len(batch) for batch in articles_per_ticker]
+    )
+    article_tickers = [tickers[i] for i in ticker_ids]
+
+    now = datetime.now(timezone.utc)
+    ages_hours = np.fromiter(
+        ((now - article["published_at"]).total_seconds() / 3600 for article in articles),
+        dtype=np.float64,
+        count=len(articles),
+    )
+
+    scores, topics = score_articles(articles, article_tickers)
+    mean, recency_weighted = aggregate_sentiment(scores, ticker_ids, ages_hours, len(tickers))
+
+    topic_totals = np.zeros((len(tickers), len(TOPIC_NAMES)), dtype=np.int64)
+    np.add.at(topic_totals, ticker_ids, topics)
+    key_topics = top_topics(topic_totals)
+
+    results = {}
+    for i, ticker in enumerate(tickers):
+        score = float(recency_weighted[i])
+        results[ticker] = {
+            "sentiment_score": score,  # -1 to 1 scale, recency-weighted
+            "mean_sentiment_score": float(mean[i]),
+            "sentiment_label": sentiment_label(score),
+            "news_count": len(articles_per_ticker[i]),
+            "key_topics": key_topics[i],
+        }
+    return results
+
+
+def analyze_news_sentiment(ticker: str) -> dict:
+    """Analyze news sentiment for given ticker"""
+    return analyze_news_sentiment_batch([ticker])[ticker]
 
 # Worker Nodes
 def market_data_worker(state: FinancialAnalysisState) -> Command[Literal["supervisor"]]:
@@ -133,13 +205,14 @@ def sentiment_worker(state: FinancialAnalysisState) -> Command[Literal["supervis
     report = f"""Sentiment Analysis for {ticker}:
     
 Overall Sentiment: {sentiment['sentiment_label'].upper()} ({sentiment['sentiment_score']:+.2f})
+Mean Article Sentiment: {sentiment['mean_sentiment_score']:+.2f}
 News Articles Analyzed: {sentiment['news_count']}
 
 Key Topics:
 {chr(10).join(f"- {topic}" for topic in sentiment['key_topics'])}
 
 Interpretation:
-{"Strong positive sentiment suggests bullish market perception." if sentiment['sentiment_score'] > 0.5 else "Negative sentiment indicates bearish market perception." if sentiment['sentiment_score'] < -0.5 else "Neutral sentiment suggests market uncertainty."}
+{SENTIMENT_INTERPRETATIONS[sentiment['sentiment_label']]}
 """
     
     return Command(
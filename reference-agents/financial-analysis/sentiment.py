@@ -0,0 +1,265 @@
+"""
+Local News Sentiment Engine - Financial Analysis Agent
+
+CPU-only sentiment scoring for the sentiment worker: a finance lexicon applied
+to whole batches of articles at once. Scores are cached by article content
+hash so articles shared across tickers (and repeated requests) are only
+scored once.
+
+Requires: numpy
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Configuration
+SENTIMENT_CACHE_SIZE = max(0, int(os.getenv("SENTIMENT_CACHE_SIZE", "10000")))
+SENTIMENT_HALF_LIFE_HOURS = float(os.getenv("SENTIMENT_HALF_LIFE_HOURS", "24"))
+if not SENTIMENT_HALF_LIFE_HOURS > 0:
+    raise ValueError(
+        f"SENTIMENT_HALF_LIFE_HOURS must be positive, got {SENTIMENT_HALF_LIFE_HOURS}"
+    )
+NEGATION_WINDOW = 3  # A negator flips lexicon hits up to this many tokens later in its sentence
+LABEL_THRESHOLD = 0.15  # |score| above this is labelled positive/negative
+
+FINANCE_LEXICON = {
+    # Positive
+    "beat": 1.0, "beats": 1.0, "exceeded": 1.0, "outperform": 1.0, "outperformed": 1.0,
+    "growth": 0.8, "grew": 0.8, "surge": 1.0, "surged": 1.0, "rally": 0.9, "rallied": 0.9,
+    "record": 0.7, "strong": 0.8, "upgrade": 1.0, "upgraded": 1.0, "bullish": 1.0,
+    "profit": 0.7, "profitable": 0.8, "gain": 0.7, "gains": 0.7, "raised": 0.6,
+    "expansion": 0.6, "launch": 0.4, "innovative": 0.5, "buyback": 0.6, "dividend": 0.4,
+    "robust": 0.8, "momentum": 0.5, "approval": 0.6, "partnership": 0.4,
+    # Negative
+    "miss": -1.0, "missed": -1.0, "misses": -1.0, "underperform": -1.0, "decline": -0.8,
+    "declined": -0.8, "drop": -0.8, "dropped": -0.8, "fell": -0.8, "plunge": -1.0,
+    "plunged": -1.0, "weak": -0.8, "downgrade": -1.0, "downgraded": -1.0, "bearish": -1.0,
+    "loss": -0.8, "losses": -0.8, "lawsuit": -0.9, "investigation": -0.8, "recall": -0.8,
+    "layoffs": -0.7, "cut": -0.6, "lowered": -0.7, "fraud": -1.0, "defaulted": -1.0,
+    "bankruptcy": -1.0, "volatile": -0.4, "slowdown": -0.7, "fined": -0.7, "penalty": -0.7,
+    "probe": -0.7, "failed": -0.8, "fails": -0.8,
+}
+NEGATORS = frozenset({"not", "no", "never", "without", "didn't"})
+# Negative events that only negate as "<word> to ..." ("failed to beat")
+INFINITIVE_NEGATORS = frozenset({"failed", "fails"})
+
+TOPIC_KEYWORDS = {
+    "earnings": ("earnings", "eps", "quarter", "quarterly", "revenue", "guidance"),
+    "product launch": ("launch", "product", "unveil", "unveiled", "release"),
+    "market expansion": ("expansion", "expand", "markets", "international"),
+    "regulation": ("regulator", "regulators", "investigation", "probe", "lawsuit", "fined", "penalty"),
+    "analyst ratings": ("upgrade", "upgraded", "downgrade", "downgraded", "analyst", "analysts"),
+    "capital return": ("buyback", "dividend", "repurchase"),
+}
+TOPIC_NAMES = list(TOPIC_KEYWORDS)
+
+# Articles are joined with _DOC_SEP and tokenized in one regex pass; the token
+# pattern also matches the separator and sentence punctuation (but not decimal
+# points) so article and sentence boundaries come out of the same pass.
+_DOC_SEP = "\x00"
+_SENTENCE_ENDS = (".", ";", "!", "?")
+_TICKER_PLACEHOLDER = "ticker"
+_TOKEN_RE = re.compile(r"[a-z][a-z']*|[.;!?](?!\d)|\x00")
+
+# Every token the scorer cares about gets an integer code; per-code attributes
+# live in parallel arrays whose last row describes unknown tokens (code -1).
+_KNOWN_TOKENS = list(dict.fromkeys([
+    _DOC_SEP, *_SENTENCE_ENDS, "to",
+    *FINANCE_LEXICON, *NEGATORS, *INFINITIVE_NEGATORS,
+    *(word for words in TOPIC_KEYWORDS.values() for word in words),
+]))
+_TOKEN_CODES = {token: code for code, token in enumerate(_KNOWN_TOKENS)}
+_DOC_SEP_CODE = _TOKEN_CODES[_DOC_SEP]
+_TO_CODE = _TOKEN_CODES["to"]
+_TOPIC_OF_WORD = {word: idx for idx, words in enumerate(TOPIC_KEYWORDS.values()) for word in words}
+
+_CODE_WEIGHT = np.array([FINANCE_LEXICON.get(t, 0.0) for t in _KNOWN_TOKENS] + [0.0])
+_CODE_TOPIC = np.array([_TOPIC_OF_WORD.get(t, -1) for t in _KNOWN_TOKENS] + [-1], dtype=np.int64)
+_CODE_NEGATOR = np.array([t in NEGATORS for t in _KNOWN_TOKENS] + [False])
+_CODE_INFINITIVE_NEGATOR = np.array([t in INFINITIVE_NEGATORS for t in _KNOWN_TOKENS] + [False])
+_CODE_BOUNDARY = np.array([t == _DOC_SEP or t in _SENTENCE_ENDS for t in _KNOWN_TOKENS] + [False])
+
+_sentiment_cache: OrderedDict[str, tuple[float, np.ndarray]] = OrderedDict()
+_sentiment_cache_lock = threading.Lock()
+
+
+def _article_text(article: dict) -> str:
+    return f"{article.get('title', '')}\n{article.get('body', '')}"
+
+
+def _masked_ticker(ticker: str | None) -> str | None:
+    """Ticker to strip from article text, if it would otherwise be scored"""
+    if ticker and ticker.lower() in _TOKEN_CODES:
+        return ticker
+    return None
+
+
+def _strip_ticker(text: str, ticker: str | None) -> str:
+    """Replace the ticker symbol with a neutral word, keeping the token count"""
+    if ticker is None:
+        return text
+    return re.sub(rf"(?<![A-Za-z]){re.escape(ticker)}(?![A-Za-z])", _TICKER_PLACEHOLDER, text)
+
+
+def _article_key(article: dict, ticker: str | None = None) -> str:
+    """
+    Cache key for an article: its content hash, plus the ticker when that
+    ticker is masked before scoring (see _masked_ticker).
+    """
+    content = _article_text(article)
+    if ticker is not None:
+        content = f"{content}{_DOC_SEP}{ticker}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _score_texts(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score a batch of article texts against the finance lexicon.
+
+    The batch is tokenized with one regex pass over the joined texts and each
+    token is mapped to an integer code with a single dict lookup. Lexicon,
+    topic and negator attributes are then gathered by code, and negation and
+    per-article sums are array operations over the whole batch. Negation
+    never crosses a sentence or article boundary.
+
+    Returns (scores in [-1, 1], topic hit counts of shape [n_articles, n_topics]).
+    """
+    n_docs = len(texts)
+    topic_counts = np.zeros((n_docs, len(TOPIC_NAMES)), dtype=np.int64)
+    joined = _DOC_SEP.join(text.replace(_DOC_SEP, " ") for text in texts)
+    raw_tokens = _TOKEN_RE.findall(joined.replace("\u2019", "'").lower())
+    raw_codes = np.fromiter(
+        (_TOKEN_CODES.get(token, -1) for token in raw_tokens),
+        dtype=np.int64,
+        count=len(raw_tokens),
+    )
+
+    is_boundary = _CODE_BOUNDARY[raw_codes]
+    doc_ids = np.cumsum(raw_codes == _DOC_SEP_CODE)[~is_boundary]
+    sentence_ids = np.cumsum(is_boundary)[~is_boundary]
+    codes = raw_codes[~is_boundary]
+    lengths = np.bincount(doc_ids, minlength=n_docs)
+    if codes.size == 0:
+        return np.zeros(n_docs), topic_counts
+
+    # "failed to ..." negates; "failed merger" is only a negative event
+    same_sentence_as_next = sentence_ids[1:] == sentence_ids[:-1]
+    followed_by_to = np.append((codes[1:] == _TO_CODE) & same_sentence_as_next, False)
+    is_negator = _CODE_NEGATOR[codes] | (_CODE_INFINITIVE_NEGATOR[codes] & followed_by_to)
+
+    # Position of the closest negator strictly before each token (-1 if none)
+    positions = np.arange(codes.size)
+    last_negator = np.maximum.accumulate(np.where(is_negator, positions, -1))
+    prev_negator = np.concatenate(([-1], last_negator[:-1]))
+    negated = (
+        (prev_negator >= 0)
+        & (positions - prev_negator <= NEGATION_WINDOW)
+        & (sentence_ids[np.maximum(prev_negator, 0)] == sentence_ids)
+    )
+
+    token_weights = np.where(negated, -1.0, 1.0) * _CODE_WEIGHT[codes]
+    raw = np.bincount(doc_ids, weights=token_weights, minlength=n_docs)
+
+    # Length-normalize so long articles don't saturate the score
+    scores = np.tanh(raw / np.sqrt(np.maximum(lengths, 1)) * 2.0)
+
+    topic_ids = _CODE_TOPIC[codes]
+    topic_hit = topic_ids >= 0
+    np.add.at(topic_counts, (doc_ids[topic_hit], topic_ids[topic_hit]), 1)
+
+    return scores, topic_counts
+
+
+def score_articles(
+    articles: list[dict],
+    tickers: list[str] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score articles, reusing cached results keyed by content hash.
+
+    tickers optionally gives the ticker each article was fetched for; a ticker
+    symbol that is itself a lexicon or topic word (e.g. GAIN) is replaced with
+    a neutral word in its articles before scoring. Only cache misses are scored, in a single
+    batch. Duplicate articles within the batch are scored once.
+    """
+    masked = [_masked_ticker(t) for t in tickers] if tickers else [None] * len(articles)
+    keys = [_article_key(article, ticker) for article, ticker in zip(articles, masked)]
+    scores = np.empty(len(articles), dtype=np.float64)
+    topics = np.zeros((len(articles), len(TOPIC_NAMES)), dtype=np.int64)
+
+    missing: dict[str, list[int]] = {}
+    with _sentiment_cache_lock:
+        for i, key in enumerate(keys):
+            cached = _sentiment_cache.get(key)
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                _sentiment_cache.move_to_end(key)
+                scores[i], topics[i] = cached
+
+    if missing:
+        texts = [
+            _strip_ticker(_article_text(articles[positions[0]]), masked[positions[0]])
+            for positions in missing.values()
+        ]
+        new_scores, new_topics = _score_texts(texts)
+
+        with _sentiment_cache_lock:
+            for (key, positions), score, topic_row in zip(missing.items(), new_scores, new_topics):
+                scores[positions] = score
+                topics[positions] = topic_row
+                # Copy so the entry doesn't keep the whole batch array alive
+                _sentiment_cache[key] = (float(score), topic_row.copy())
+            while len(_sentiment_cache) > SENTIMENT_CACHE_SIZE:
+                _sentiment_cache.popitem(last=False)
+
+    return scores, topics
+
+
+def aggregate_sentiment(
+    scores: np.ndarray,
+    ticker_ids: np.ndarray,
+    ages_hours: np.ndarray,
+    n_tickers: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate article scores per ticker.
+
+    Returns (mean score, recency-weighted score) arrays of length n_tickers.
+    Recency weights decay exponentially with SENTIMENT_HALF_LIFE_HOURS.
+    """
+    counts = np.bincount(ticker_ids, minlength=n_tickers)
+    sums = np.bincount(ticker_ids, weights=scores, minlength=n_tickers)
+    mean = np.divide(sums, counts, out=np.zeros(n_tickers), where=counts > 0)
+
+    weights = np.exp2(-np.maximum(ages_hours, 0.0) / SENTIMENT_HALF_LIFE_HOURS)
+    weight_sums = np.bincount(ticker_ids, weights=weights, minlength=n_tickers)
+    weighted_sums = np.bincount(ticker_ids, weights=weights * scores, minlength=n_tickers)
+    recency_weighted = np.divide(
+        weighted_sums, weight_sums, out=np.zeros(n_tickers), where=weight_sums > 0
+    )
+    return mean, recency_weighted
+
+
+def top_topics(topic_counts: np.ndarray, k: int = 3) -> list[list[str]]:
+    """Names of the k most mentioned topics per row, most frequent first"""
+    ranked = np.argsort(-topic_counts, axis=1, kind="stable")[:, :k]
+    present = np.take_along_axis(topic_counts, ranked, axis=1) > 0
+    return [
+        [TOPIC_NAMES[t] for t, hit in zip(row, hits) if hit]
+        for row, hits in zip(ranked, present)
+    ]
+
+
+def sentiment_label(score: float) -> str:
+    """Map a [-1, 1] sentiment score to a label"""
+    if score > LABEL_THRESHOLD:
+        return "positive"
+    if score < -LABEL_THRESHOLD:
+        return "negative"
+    return "neutral"
@@ -0,0 +1,185 @@
+"""
+Checks for the local sentiment engine (requires numpy and pytest).
+
+Run from this directory: python -m pytest -q test_sentiment.py
+"""
+
+import importlib
+
+import numpy as np
+import pytest
+
+import sentiment
+from sentiment import _score_texts, aggregate_sentiment, score_articles, top_topics
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    sentiment._sentiment_cache.clear()
+    yield
+    sentiment._sentiment_cache.clear()
+
+
+def test_negation_window_flips_polarity():
+    scores, _ = _score_texts([
+        "Company failed to beat estimates",
+        "Shares fell without a rally",
+        "Company beat estimates",
+    ])
+    assert scores[0] < 0
+    assert scores[1] < 0
+    assert scores[2] > 0
+
+
+def test_negation_does_not_cross_articles():
+    scores, _ = _score_texts(["Guidance was not", "Strong quarter"])
+    assert scores[1] > 0
+
+
+def test_negation_does_not_cross_sentences():
+    scores, _ = _score_texts([
+        "The deal failed. Profit grew strongly.",
+        "Guidance was not raised. Strong demand and record profit.",
+    ])
+    assert scores[0] > 0
+    assert scores[1] > 0
+
+
+def test_failed_negates_only_before_to():
+    scores, _ = _score_texts(["Failed merger, strong growth", "Failed to post strong growth"])
+    assert scores[0] > 0  # "failed" counts against; "strong growth" is not flipped
+    assert scores[1] < 0
+
+
+def test_curly_apostrophe_negation():
+    curly, _ = _score_texts(["Company didn\u2019t beat estimates"])
+    straight, _ = _score_texts(["Company didn't beat estimates"])
+    assert curly[0] < 0
+    np.testing.assert_allclose(curly, straight)
+
+
+def test_decimal_point_is_not_a_sentence_end():
+    scores, _ = _score_texts(["Revenue did not grow 2.5 percent; margins strong"])
+    np.testing.assert_allclose(scores, _score_texts(["Revenue did not grow 25 percent; margins strong"])[0])
+
+
+def test_very_long_token():
+    blob = "a" * 20_000
+    texts = ["Strong growth"] * 1000 + [f"Record profit {blob} beat"]
+    scores, _ = _score_texts(texts)
+    assert scores.shape == (1001,)
+    assert scores[-1] > 0
+
+
+def test_topic_counts():
+    _, topics = _score_texts(["Quarterly earnings beat; analysts upgrade", "No topics here"])
+    names = sentiment.TOPIC_NAMES
+    assert topics[0, names.index("earnings")] == 2
+    assert topics[0, names.index("analyst ratings")] == 2
+    assert topics[0].sum() == 4
+    assert topics[1].sum() == 0
+
+
+def test_top_topics_ranking():
+    counts = np.zeros((2, len(sentiment.TOPIC_NAMES)), dtype=np.int64)
+    counts[0, [0, 3, 5]] = [1, 4, 2]
+    counts[0, 1] = 2  # ties keep TOPIC_NAMES order
+    names = sentiment.TOPIC_NAMES
+    assert top_topics(counts) == [[names[3], names[1], names[5]], []]
+
+
+def test_ticker_symbol_is_not_scored():
+    gain, _ = score_articles([{"title": "GAIN faces regulator probe"}], ["GAIN"])
+    acme, _ = score_articles([{"title": "ACME faces regulator probe"}], ["ACME"])
+    np.testing.assert_allclose(gain, acme)
+    assert gain[0] < 0
+
+    # Only the ticker symbol is masked, not the same word in lower case
+    shared = {"title": "GAIN and ACME post gain"}
+    for_gain, _ = score_articles([shared], ["GAIN"])
+    for_acme, _ = score_articles([shared], ["ACME"])
+    assert 0 < for_gain[0] < for_acme[0]
+
+
+def test_ambiguous_words_are_neutral():
+    scores, topics = _score_texts(["Results were fine", "Enabled by default"])
+    np.testing.assert_array_equal(scores, [0.0, 0.0])
+    assert topics.sum() == 0
+
+
+def test_empty_text_scores_zero():
+    scores, topics = _score_texts(["", "Strong growth"])
+    assert scores[0] == 0.0
+    assert scores[1] > 0
+    assert topics.shape == (2, len(sentiment.TOPIC_NAMES))
+
+    scores, _ = _score_texts(["", ""])
+    np.testing.assert_array_equal(scores, [0.0, 0.0])
+
+
+def test_cache_hit_and_eviction(monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_CACHE_SIZE", 2)
+    calls = []
+    original = sentiment._score_texts
+    monkeypatch.setattr(
+        sentiment, "_score_texts", lambda texts: calls.append(len(texts)) or original(texts)
+    )
+
+    a = {"title": "A", "body": "Strong growth"}
+    b = {"title": "B", "body": "Weak demand"}
+    c = {"title": "C", "body": "Record profit"}
+
+    first, _ = score_articles([a, b, a])
+    assert calls == [2]  # duplicate article scored once
+
+    second, _ = score_articles([a, b])
+    assert calls == [2]  # served from cache
+    np.testing.assert_array_equal(second, first[:2])
+
+    score_articles([c])  # evicts least recently used entry (a)
+    assert len(sentiment._sentiment_cache) == 2
+    assert sentiment._article_key(a) not in sentiment._sentiment_cache
+
+    cached_topics = sentiment._sentiment_cache[sentiment._article_key(c)][1]
+    assert cached_topics.base is None
+
+
+def test_equal_ages_mean_matches_recency_weighted():
+    scores = np.array([0.5, -0.2, 0.9, 0.1])
+    ticker_ids = np.array([0, 0, 1, 1])
+    ages = np.full(4, 6.0)
+    mean, weighted = aggregate_sentiment(scores, ticker_ids, ages, 3)
+    np.testing.assert_allclose(mean, [0.15, 0.5, 0.0])
+    np.testing.assert_allclose(weighted, mean)
+
+
+def test_recency_weighting_uses_half_life(monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_HALF_LIFE_HOURS", 24.0)
+    scores = np.array([1.0, -1.0])
+    ticker_ids = np.array([0, 0])
+    ages = np.array([0.0, 24.0])  # weights 1 and 0.5
+    mean, weighted = aggregate_sentiment(scores, ticker_ids, ages, 1)
+    np.testing.assert_allclose(mean, [0.0])
+    np.testing.assert_allclose(weighted, [(1.0 - 0.5) / 1.5])
+
+
+@pytest.mark.parametrize("value", ["0", "-5"])
+def test_rejects_non_positive_half_life(monkeypatch, value):
+    monkeypatch.setenv("SENTIMENT_HALF_LIFE_HOURS", value)
+    with pytest.raises(ValueError, match="SENTIMENT_HALF_LIFE_HOURS"):
+        importlib.reload(sentiment)
+    monkeypatch.delenv("SENTIMENT_HALF_LIFE_HOURS")
+    importlib.reload(sentiment)
+
+
+def test_negative_cache_size_disables_cache(monkeypatch):
+    monkeypatch.setenv("SENTIMENT_CACHE_SIZE", "-1")
+    importlib.reload(sentiment)
+    try:
+        assert sentiment.SENTIMENT_CACHE_SIZE == 0
+        scores, _ = sentiment.score_articles([{"title": "Strong growth"}])
+        assert scores[0] > 0
+        assert len(sentiment._sentiment_cache) == 0
+    finally:
+        monkeypatch.delenv("SENTIMENT_CACHE_SIZE")
+        importlib.reload(sentiment)